@@ -1,9 +1,9 @@
-import json
 import time
 
 import click
+import orjson
 
-from ..config import ExtractorConfig
+from ..config import ExtractorConfig, get_config
 from ..core import Extractor
 from ..lm import LLM
 
@@ -13,7 +13,7 @@ from ..lm import LLM
 def cli(ctx):
     """A simple CLI for interacting with LLMs."""
     ctx.ensure_object(dict)
-    ctx.obj["config"] = ExtractorConfig()
+    ctx.obj["config"] = get_config()
 
 
 @cli.command()
@@ -52,15 +52,26 @@ def ask(ctx, query: str):
 def extract(ctx, pdf_url: str):
     """Extract PDF data"""
     config: ExtractorConfig = ctx.obj["config"]
-    extractor = Extractor.from_config(config)
     s_time = time.time()
-    pdf_page_data = extractor.extract_pdf(pdf_url=pdf_url)
-    text_chunks = extractor.page_data_to_text_chunks(pdf_page_data, by="blocks")
+    # a single extraction would spend longer spawning worker processes than they save
+    serial_config = config.model_copy(update={"max_extraction_workers": 1})
+    with Extractor.from_config(serial_config) as extractor:
+        pdf_page_data = extractor.extract_pdf(pdf_url=pdf_url)
+        text_chunks = extractor.page_data_to_text_chunks(pdf_page_data, by="blocks")
+        doc_ms = (time.time() - s_time) * 1000
 
-    final_output = []
-    for i, text_chunk in enumerate(text_chunks):
-        final_output.append(
-            {
+    print(f"Document processing took: {doc_ms:.2f}ms")
+
+    # orjson serializes the text chunk dataclasses directly and writes utf-8 bytes
+    with open(f".local.data.json", "wb") as f:
+        f.write(orjson.dumps(text_chunks, option=orjson.OPT_INDENT_2))
+
+    # stream the highlights one at a time rather than building them all in memory,
+    # indenting each one so the file matches a single indented dump of the list
+    with open(f".local.output.json", "wb") as f:
+        f.write(b"[")
+        for i, text_chunk in enumerate(text_chunks):
+            highlight = {
                 "id": i,
                 "title": f"Highlight {i+1}",
                 "text": text_chunk.text,
@@ -74,18 +85,14 @@ def extract(ctx, pdf_url: str):
                     }
                 ],
             }
-        )
-
-    doc_ms = (time.time() - s_time) * 1000
-    print(f"Document processing took: {doc_ms:.2f}ms")
-
-    with open(f".local.data.json", "w", encoding="utf-8") as f:
-        json_list = [json.loads(data.model_dump_json()) for data in text_chunks]
-        json.dump(json_list, f, indent=2, ensure_ascii=False)
-
-    with open(f".local.output.json", "w", encoding="utf-8") as f:
-        json_list = final_output
-        json.dump(json_list, f, indent=2, ensure_ascii=False)
+            f.write(b",\n  " if i else b"\n  ")
+            f.write(
+                orjson.dumps(highlight, option=orjson.OPT_INDENT_2).replace(
+                    b"\n", b"\n  "
+                )
+            )
+        f.write(b"\n]" if text_chunks else b"]")
 
 
-cli()
+if __name__ == "__main__":
+    cli()
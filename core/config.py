@@ -1,6 +1,8 @@
+from functools import lru_cache
 from pathlib import Path
-from typing import ClassVar
+from typing import Any, ClassVar
 
+import yaml
 from pydantic import BaseModel, SecretStr
 from pydantic_settings import (
     BaseSettings,
@@ -11,6 +13,17 @@ from pydantic_settings import (
 from .constants import BASE_CONFIG_PATH, LOCAL_CONFIG_PATH
 
 
+class FastYamlConfigSettingsSource(YamlConfigSettingsSource):
+    """
+    YAML settings source that parses with libyaml's C loader when it is available.
+    """
+
+    def _read_file(self, file_path: Path) -> dict[str, Any]:
+        loader = yaml.CSafeLoader if yaml.__with_libyaml__ else yaml.SafeLoader
+        with file_path.open(encoding=self.yaml_file_encoding) as yaml_file:
+            return yaml.load(yaml_file, Loader=loader) or {}
+
+
 class LLMConfig(BaseModel):
     model_name: str
     api_key: SecretStr
@@ -21,6 +34,8 @@ class ExtractorConfig(BaseSettings, case_sensitive=False):
 
     max_pdf_file_size_bytes: int
     max_pdf_file_page_count: int
+    max_extraction_workers: int
+    max_extraction_worker_memory_bytes: int
 
     custom_config_path: ClassVar[Path | None] = None
 
@@ -42,15 +57,25 @@ class ExtractorConfig(BaseSettings, case_sensitive=False):
 
         if cls.custom_config_path is not None:
             sources.append(
-                YamlConfigSettingsSource(settings_cls, yaml_file=cls.custom_config_path)
+                FastYamlConfigSettingsSource(
+                    settings_cls, yaml_file=cls.custom_config_path
+                )
             )
 
         if LOCAL_CONFIG_PATH.exists():
             sources.append(
-                YamlConfigSettingsSource(settings_cls, yaml_file=LOCAL_CONFIG_PATH)
+                FastYamlConfigSettingsSource(settings_cls, yaml_file=LOCAL_CONFIG_PATH)
             )
 
         sources.append(
-            YamlConfigSettingsSource(settings_cls, yaml_file=BASE_CONFIG_PATH)
+            FastYamlConfigSettingsSource(settings_cls, yaml_file=BASE_CONFIG_PATH)
         )
         return tuple(sources)
+
+
+@lru_cache(maxsize=1)
+def get_config() -> ExtractorConfig:
+    """
+    Load the extractor config once and reuse it for every later caller.
+    """
+    return ExtractorConfig()
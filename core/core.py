@@ -1,44 +1,200 @@
-import json
+import hashlib
+import math
+import multiprocessing
+import os
+import threading
 import time
-from functools import lru_cache, wraps
-from typing import List, Literal
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Hashable, Iterator, List, Literal, Optional
 
+import httpx
 import pymupdf
-import requests
 
 from .config import ExtractorConfig
 from .lm import LLM
 from .output import PageData, TextChunk, TextExtractionSettings
 
 
-def timed_lru_cache(seconds: int, maxsize: int = 128):
+class TimedLRUCache:
     """LRU cache with time-based expiration."""
 
-    def wrapper(fn):
-        fn = lru_cache(maxsize=maxsize)(fn)
-        fn.lifetime = seconds
-        fn.expiry = time.time() + fn.lifetime
+    def __init__(self, seconds: int, maxsize: int = 128):
+        self.lifetime = seconds
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
 
-        @wraps(fn)
-        def wrapped(*args, **kwargs):
-            if time.time() >= fn.expiry:
-                fn.cache_clear()
-                fn.expiry = time.time() + fn.lifetime
-            return fn(*args, **kwargs)
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expiry, value = entry
+            if time.time() >= expiry:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
 
-        wrapped.cache_clear = fn.cache_clear
-        return wrapped
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.lifetime, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
 
-    return wrapper
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _content_hasher():
+    """Create the incremental hash used to key cached page data by PDF content."""
+    return hashlib.blake2b(digest_size=16)
+
+
+# a worker range costs roughly 5ms to start plus 2.5ms per MB of pdf bytes to ship
+# and open, and its page data costs up to 5ms per page to send back, against 2-11ms
+# of extraction per page, so smaller ranges gain little over extracting in-process
+MIN_PAGES_PER_WORKER = 64
+
+# each worker holds about twice the pdf size at its peak (its unpickled copy of the
+# bytes and the document opened from them), and this process one pickled copy each
+WORKER_MEMORY_PER_PDF_BYTE = 3
+
+
+def _warm_up_worker() -> None:
+    """
+    Do nothing. Unpickling this in a fresh worker imports this module, and with it
+    pymupdf, before the worker is handed its first page range.
+    """
+
+
+def _extract_page(page: pymupdf.Page, page_number: int) -> PageData:
+    """
+    Extract the text data of a single page, falling back to OCR if it has no text.
+    """
+    # extractDICT builds the same tree as extractJSON without serializing it to
+    # json and parsing it back, and a page without text simply has no blocks
+    page_data_dict = page.get_textpage().extractDICT(sort=True)
+
+    # run ocr on page if it has no text
+    if not page_data_dict["blocks"]:
+        textpage = page.get_textpage_ocr(full=False)
+        page_data_dict = textpage.extractDICT(sort=True)
+
+    return PageData.from_pymupdf_textpage_json(page_data_dict, page_number=page_number)
+
+
+def _extract_pages(
+    pdf_document: pymupdf.Document, start: int, stop: int
+) -> List[PageData]:
+    """
+    Extract pages [start, stop) of an open PDF document.
+    """
+    pdf_page_data = [
+        _extract_page(pdf_document[index], index + 1) for index in range(start, stop)
+    ]
+    _share_repeated_texts(pdf_page_data)
+    return pdf_page_data
+
+
+def _share_repeated_texts(pdf_page_data: List[PageData]) -> None:
+    """
+    Point spans with the same text (headers, footers, labels) at one string object.
+    A local pool is used rather than sys.intern, which makes strings immortal on 3.12.
+    """
+    texts: dict[str, str] = {}
+    for page in pdf_page_data:
+        for block in page.blocks:
+            for line in block.lines:
+                for span in line.spans:
+                    span.text = texts.setdefault(span.text, span.text)
+
+
+def _extract_page_range(content: bytes, start: int, stop: int) -> List[PageData]:
+    """
+    Extract pages [start, stop) of a PDF in a worker process. PyMuPDF documents
+    cannot be shared across processes, so each worker opens its own from the bytes.
+    """
+    pdf_document = pymupdf.Document(stream=content, filetype="pdf")
+    return _extract_pages(pdf_document, start, stop)
+
+
+# the chunkers below skip whitespace-only page data before a chunk is even built
+def _spans_of_page(
+    page: PageData, settings: TextExtractionSettings
+) -> Iterator[TextChunk]:
+    for block in page.blocks:
+        for line in block.lines:
+            for span in line.spans:
+                if span.has_text:
+                    yield TextChunk.from_span_data(
+                        span, page_number=page.page_number, settings=settings
+                    )
+
+
+def _lines_of_page(
+    page: PageData, settings: TextExtractionSettings
+) -> Iterator[TextChunk]:
+    for block in page.blocks:
+        for line in block.lines:
+            if line.has_text:
+                yield TextChunk.from_line_data(
+                    line, page_number=page.page_number, settings=settings
+                )
+
+
+def _blocks_of_page(
+    page: PageData, settings: TextExtractionSettings
+) -> Iterator[TextChunk]:
+    for block in page.blocks:
+        if block.has_text:
+            yield TextChunk.from_block_data(
+                block, page_number=page.page_number, settings=settings
+            )
+
+
+_PAGE_CHUNKERS = {
+    "spans": _spans_of_page,
+    "lines": _lines_of_page,
+    "blocks": _blocks_of_page,
+}
 
 
 class Extractor:
     def __init__(
-        self, llm: LLM, max_pdf_file_size_bytes: int, max_pdf_file_page_count: int
+        self,
+        llm: LLM,
+        max_pdf_file_size_bytes: int,
+        max_pdf_file_page_count: int,
+        max_extraction_workers: int = 1,
+        max_extraction_worker_memory_bytes: int = 0,
     ) -> "Extractor":
         self.llm = llm
         self.max_pdf_file_size_bytes = max_pdf_file_size_bytes
         self.max_pdf_file_page_count = max_pdf_file_page_count
+        self.max_extraction_workers = max(
+            1, min(max_extraction_workers, os.cpu_count() or 1)
+        )
+        self.max_extraction_worker_memory_bytes = max_extraction_worker_memory_bytes
+        self._executor: ProcessPoolExecutor | None = None
+        self._executor_lock = threading.Lock()
+
+        # one pooled client so repeated downloads from a host reuse its connection
+        self._http = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=10),
+        )
+
+        # page data is cached by pdf content so that mirrors and urls that only
+        # differ in their query string share one entry, while each url remembers
+        # the digest and etag of the pdf it last served
+        self._page_data_cache = TimedLRUCache(seconds=600, maxsize=6)
+        self._url_cache = TimedLRUCache(seconds=600, maxsize=128)
 
     @classmethod
     def from_config(cls, config: ExtractorConfig) -> "Extractor":
@@ -47,30 +203,72 @@ class Extractor:
             llm=llm,
             max_pdf_file_size_bytes=config.max_pdf_file_size_bytes,
             max_pdf_file_page_count=config.max_pdf_file_page_count,
+            max_extraction_workers=config.max_extraction_workers,
+            max_extraction_worker_memory_bytes=config.max_extraction_worker_memory_bytes,
         )
 
-    @timed_lru_cache(seconds=600, maxsize=6)
     def extract_pdf(self, pdf_url: str) -> List[PageData]:
         """
         Extract text data from a PDF using built-in text and OCR capabilities.
         """
-        pdf_document = self._validate_and_download_pdf(pdf_url)
+        etag, digest = self._url_cache.get(pdf_url, (None, None))
+        cached_page_data = self._page_data_cache.get(digest)
 
-        pdf_page_data: List[PageData] = []
-        for page_number, page in enumerate(pdf_document, start=1):
-            page: pymupdf.Page = page
-            page_data_json = json.loads(page.get_textpage().extractJSON(sort=True))
+        # without an etag the cached page data is trusted until it expires, with
+        # one the server is asked whether the pdf changed before reusing it
+        if cached_page_data is not None and etag is None:
+            return cached_page_data
+        download = self._validate_and_download_pdf(
+            pdf_url, etag=etag if cached_page_data is not None else None
+        )
+        if download is None:
+            return cached_page_data
+
+        content, digest, etag = download
+        self._url_cache.set(pdf_url, (etag, digest))
+
+        pdf_page_data = self._page_data_cache.get(digest)
+        if pdf_page_data is None:
+            pdf_page_data = self._extract_page_data(content)
+            self._page_data_cache.set(digest, pdf_page_data)
+        return pdf_page_data
 
-            # run ocr on page if it has no text
-            if page_data_json["blocks"] == []:
-                ocr_textpage = page.get_textpage_ocr(full=False)
-                page_data_json = json.loads(ocr_textpage.extractJSON(sort=True))
+    def _extract_page_data(self, content: bytes) -> List[PageData]:
+        """
+        Extract the page data of downloaded PDF bytes, in parallel for large PDFs.
+        """
+        pdf_document = self._open_pdf(content)
+        page_count = pdf_document.page_count
+
+        # every worker gets its own copy of the pdf, so large pdfs get fewer workers
+        worker_memory = WORKER_MEMORY_PER_PDF_BYTE * len(content)
+        workers = min(
+            self.max_extraction_workers,
+            page_count // MIN_PAGES_PER_WORKER,
+            1 + self.max_extraction_worker_memory_bytes // worker_memory,
+        )
+        if workers <= 1:
+            return _extract_pages(pdf_document, 0, page_count)
 
-            page_data: PageData = PageData.from_pymupdf_textpage_json(
-                page_data_json, page_number=page_number
+        # split pages into one contiguous range per worker, this process included,
+        # so that each worker only has to open the document once
+        step = math.ceil(page_count / workers)
+        starts = range(0, page_count, step)
+        futures = [
+            self._get_executor().submit(
+                _extract_page_range,
+                content,
+                start,
+                min(start + step, page_count),
             )
-            pdf_page_data.append(page_data)
+            for start in starts[1:]
+        ]
 
+        # extract the first range here, with the document that is already open,
+        # while the worker processes extract the rest
+        pdf_page_data = _extract_pages(pdf_document, 0, step)
+        for future in futures:
+            pdf_page_data.extend(future.result())
         return pdf_page_data
 
     def page_data_to_text_chunks(
@@ -91,77 +289,114 @@ class Extractor:
             min_word_frequency=min_word_frequency,
             remove_non_alpha=remove_non_alpha,
         )
-        text_chunks: List[TextChunk] = []
-        for page in pdf_page_data:
-            page_number = page.page_number
-
-            if by == "spans":
-                for block in page.blocks:
-                    for line in block.lines:
-                        for span in line.spans:
-                            text_chunks.append(
-                                TextChunk.from_span_data(
-                                    span,
-                                    page_number=page_number,
-                                    settings=settings,
-                                )
-                            )
-            elif by == "lines":
-                for block in page.blocks:
-                    for line in block.lines:
-                        text_chunks.append(
-                            TextChunk.from_line_data(
-                                line,
-                                page_number=page_number,
-                                settings=settings,
-                            )
-                        )
-            elif by == "blocks":
-                for block in page.blocks:
-                    text_chunks.append(
-                        TextChunk.from_block_data(
-                            block,
-                            page_number=page_number,
-                            settings=settings,
-                        )
-                    )
+        chunks_of_page = _PAGE_CHUNKERS.get(by)
+        if chunks_of_page is None:
+            return []
 
         return [
             text_chunk
-            for text_chunk in text_chunks
-            if len(set(text_chunk.text) - {" ", "\t", "\n", "\r"}) > 0
+            for page in pdf_page_data
+            for text_chunk in chunks_of_page(page, settings)
+            if text_chunk.text.strip()
+        ]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Lazily start the worker pool used for multi-page extraction. Workers are
+        spawned rather than forked since the API server calls this from threads.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                # the calling process extracts one page range itself
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_extraction_workers - 1,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up_worker,
+                )
+            return self._executor
+
+    def warm_up(self) -> None:
+        """
+        Start every worker process ahead of the first large PDF, which would
+        otherwise wait for the workers to spawn and import this module.
+        """
+        if self.max_extraction_workers <= 1:
+            return
+        executor = self._get_executor()
+        # workers are spawned one per submitted task that no idle worker can take
+        futures = [
+            executor.submit(_warm_up_worker)
+            for _ in range(self.max_extraction_workers - 1)
         ]
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        """
+        Shut down the worker pool, if one was started, and the http client.
+        """
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        self._http.close()
+
+    def __enter__(self) -> "Extractor":
+        return self
 
-    def _validate_and_download_pdf(self, pdf_url: str) -> pymupdf.Document:
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _validate_and_download_pdf(
+        self, pdf_url: str, etag: Optional[str] = None
+    ) -> Optional[tuple[bytes, bytes, Optional[str]]]:
         """
-        Download the PDF from the given URL, validate its format, size, and page count,
-        and return a PyMuPDF Document object. Raises ValueError if any check fails.
+        Download the PDF from the given URL, validate its format and size, and
+        return its raw bytes along with their digest and the response ETag. The
+        digest is computed while the download streams in. If an ETag is given and
+        the server reports the PDF as unchanged, return None instead. Raises
+        ValueError if any check fails.
         """
+        headers = {"If-None-Match": etag} if etag is not None else {}
+
         # download the PDF with streaming to avoid loading large files into memory at once
-        request = requests.get(pdf_url, stream=True)
-        content_length = int(request.headers.get("content-length", 0))
+        with self._http.stream("GET", pdf_url, headers=headers) as response:
+            if response.status_code == 304:
+                return None
 
-        # check if the file size exceeds the allowed maximum
-        if content_length > self.max_pdf_file_size_bytes:
-            raise ValueError(
-                f"PDF file too large. Maximum allowed size is {self.max_pdf_file_size_bytes} bytes."
-            )
+            content_length = int(response.headers.get("content-length", 0))
 
-        # check if the response is a valid PDF
-        if request.status_code != 200 or not request.headers.get(
-            "content-type", ""
-        ).lower().endswith("pdf"):
-            raise ValueError("Invalid PDF URL or file format.")
-
-        # stream the content and ensure it does not exceed the size limit
-        content = b""
-        for chunk in request.iter_content(1024 * 1024):
-            content += chunk
-            if len(content) > self.max_pdf_file_size_bytes:
+            # check if the file size exceeds the allowed maximum
+            if content_length > self.max_pdf_file_size_bytes:
                 raise ValueError(
                     f"PDF file too large. Maximum allowed size is {self.max_pdf_file_size_bytes} bytes."
                 )
 
+            # check if the response is a valid PDF
+            if response.status_code != 200 or not response.headers.get(
+                "content-type", ""
+            ).lower().endswith("pdf"):
+                raise ValueError("Invalid PDF URL or file format.")
+
+            # stream the content and ensure it does not exceed the size limit
+            # (appending to a bytearray avoids re-copying everything read so far per chunk)
+            content = bytearray()
+            hasher = _content_hasher()
+            for chunk in response.iter_bytes(1024 * 1024):
+                content.extend(chunk)
+                hasher.update(chunk)
+                if len(content) > self.max_pdf_file_size_bytes:
+                    raise ValueError(
+                        f"PDF file too large. Maximum allowed size is {self.max_pdf_file_size_bytes} bytes."
+                    )
+
+            return bytes(content), hasher.digest(), response.headers.get("etag")
+
+    def _open_pdf(self, content: bytes) -> pymupdf.Document:
+        """
+        Open the downloaded PDF bytes as a PyMuPDF Document and validate its page
+        count. Raises ValueError if the document is invalid or too long.
+        """
         # try to open the PDF document
         try:
             pdf_document = pymupdf.Document(stream=content, filetype="pdf")
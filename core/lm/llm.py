@@ -1,8 +1,12 @@
-from litellm import CustomStreamWrapper, completion
-from litellm.files.main import ModelResponse
+from typing import TYPE_CHECKING
 
 from ..config import LLMConfig
 
+# litellm is slow to import, so it is only loaded once a model is actually used
+if TYPE_CHECKING:
+    from litellm import CustomStreamWrapper
+    from litellm.files.main import ModelResponse
+
 
 class LLM:
     def __init__(self, model_name: str, api_key: str):
@@ -18,8 +22,9 @@ class LLM:
 
     def generate(self, system_prompt: str, user_prompt: str) -> str:
         """Generate a response from the LLM."""
+        from litellm import completion
 
-        response: ModelResponse | CustomStreamWrapper = completion(
+        response: "ModelResponse | CustomStreamWrapper" = completion(
             model=self.model_name,
             api_key=self.api_key,
             messages=[
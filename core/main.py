@@ -1,21 +1,32 @@
-import json
 import time
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
 
-from core.config import ExtractorConfig
+from core.config import get_config
 from core.core import Extractor
 from core.output import ExtractorOutput, ExtractRequest
 
-app = FastAPI()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # each run of the app gets its own extractor, closed again on shutdown, so a
+    # restarted app never reuses a closed http client or worker pool, and its
+    # workers are started here rather than by the first large pdf
+    with Extractor.from_config(get_config()) as extractor:
+        extractor.warm_up()
+        app.state.extractor = extractor
+        yield
 
-extractor = Extractor.from_config(ExtractorConfig())
 
+app = FastAPI(lifespan=lifespan)
 
-@app.post("/extract")
-def extract_pdf(request: ExtractRequest):
+
+@app.post("/extract", response_model=ExtractorOutput)
+def extract_pdf(request: ExtractRequest, http_request: Request):
     start_time = time.time()
+    extractor: Extractor = http_request.app.state.extractor
     try:
         print(f"Extracting PDF Data from URL: {request.pdf_url}")
         try:
@@ -32,9 +43,13 @@ def extract_pdf(request: ExtractRequest):
             remove_non_alpha=request.remove_non_alpha,
         )
         run_time_seconds = round(time.time() - start_time, 4)
-        result = ExtractorOutput(
-            text_chunks=text_chunks, run_time_seconds=run_time_seconds
+        # text chunks are slotted dataclasses that orjson serializes natively, so
+        # return the bytes directly and skip fastapi's validation and encoding
+        return Response(
+            orjson.dumps(
+                {"text_chunks": text_chunks, "run_time_seconds": run_time_seconds}
+            ),
+            media_type="application/json",
         )
-        return json.loads(result.model_dump_json())
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,69 +1,104 @@
 import json
-import statistics
-from collections import Counter
-from typing import List, Literal, Optional
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Literal, NamedTuple, Optional, Tuple
 
 from pydantic import BaseModel
 from wordfreq import zipf_frequency
 
 
-class Coordinates(BaseModel):
-    x: float
-    y: float
+@lru_cache(maxsize=200_000)
+def _zipf_en(word: str) -> float:
+    """
+    English zipf frequency of a word. Word use is heavily skewed towards a small
+    vocabulary, so most lookups are served from the cache.
+    """
+    return zipf_frequency(word, lang="en")
 
 
-class BoundingBox(BaseModel):
-    bottom_left: Coordinates
-    top_right: Coordinates
+# page data is built for every span of every page, so it uses plain tuples and
+# slotted dataclasses rather than pydantic models, which are kept to the API IO
+class BoundingBox(NamedTuple):
+    """
+    A pymupdf bbox, kept as its four flat coordinates so each one is a single tuple.
+    """
+
+    x0: float
+    y0: float
+    x1: float
+    y1: float
 
     @property
     def px_left(self) -> float:
-        return self.bottom_left.x
+        return self.x0
 
     @property
     def px_bottom(self) -> float:
-        return self.bottom_left.y
+        return self.y0
 
     @property
     def width(self) -> float:
-        return self.top_right.x - self.bottom_left.x
+        return self.x1 - self.x0
 
     @property
     def height(self) -> float:
-        return self.top_right.y - self.bottom_left.y
+        return self.y1 - self.y0
 
     def from_pymupdf_bbox_list(bbox_list: list[int]) -> "BoundingBox":
-        return BoundingBox(
-            bottom_left=Coordinates(x=bbox_list[0], y=bbox_list[1]),
-            top_right=Coordinates(x=bbox_list[2], y=bbox_list[3]),
-        )
+        return BoundingBox(bbox_list[0], bbox_list[1], bbox_list[2], bbox_list[3])
 
 
-class TextExtractionSettings(BaseModel):
+@dataclass(frozen=True, slots=True)
+class TextExtractionSettings:
     filter_non_english_words: bool
     min_word_length: int
     min_word_frequency: float
     remove_non_alpha: bool
 
 
-class SpanData(BaseModel):
+def _clean_text(text: str, settings: TextExtractionSettings) -> str:
+    """
+    Keep the words of a text that pass the settings.
+    """
+    # read the settings once rather than once per word
+    remove_non_alpha = settings.remove_non_alpha
+    min_word_length = settings.min_word_length
+    filter_non_english_words = settings.filter_non_english_words
+    min_word_frequency = settings.min_word_frequency
+
+    cleaned = []
+    for word in text.split():
+        if remove_non_alpha and not word.isalpha():
+            continue
+        if len(word) < min_word_length:
+            continue
+        if filter_non_english_words and _zipf_en(word) < min_word_frequency:
+            continue
+        cleaned.append(word)
+    return " ".join(cleaned)
+
+
+# headers, footers and figure labels are short and repeat across pages (and pdfs),
+# while longer texts such as whole blocks almost never do, so only short texts are
+# cached; this keeps the process-wide cache small
+_MAX_CACHED_TEXT_LENGTH = 80
+_cached_clean_text = lru_cache(maxsize=50_000)(_clean_text)
+
+
+@dataclass(slots=True)
+class SpanData:
     bounding_box: BoundingBox
     text: str
 
+    @property
+    def has_text(self) -> bool:
+        return bool(self.text.strip())
+
     def clean_text(self, settings: TextExtractionSettings) -> str:
-        cleaned = []
-        for word in self.text.split():
-            if settings.remove_non_alpha and not word.isalpha():
-                continue
-            if len(word) < settings.min_word_length:
-                continue
-            if (
-                settings.filter_non_english_words
-                and zipf_frequency(word, lang="en") < settings.min_word_frequency
-            ):
-                continue
-            cleaned.append(word)
-        return " ".join(cleaned)
+        if len(self.text) <= _MAX_CACHED_TEXT_LENGTH:
+            return _cached_clean_text(self.text, settings)
+        return _clean_text(self.text, settings)
 
     @staticmethod
     def from_pymupdf_span_json(span_json: json) -> "SpanData":
@@ -73,28 +108,52 @@ class SpanData(BaseModel):
         )
 
 
-class LineData(BaseModel):
+@dataclass(slots=True)
+class LineData:
     bounding_box: BoundingBox
     spans: List[SpanData]
+    # (span heights, most common span height), filled in on first use
+    _height_stats: Optional[Tuple[List[float], float]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def has_text(self) -> bool:
+        return any(span.has_text for span in self.spans)
+
+    @property
+    def height_stats(self) -> Tuple[List[float], float]:
+        """
+        Span heights of the line and the most common one, computed once per line
+        since a line's spans do not change after it is built.
+        """
+        if self._height_stats is None:
+            heights = [span.bounding_box.height for span in self.spans]
+            # max over a plain dict keeps the first seen height on ties, as
+            # Counter.most_common does, without building the Counter
+            counts: Dict[float, int] = {}
+            for height in heights:
+                counts[height] = counts.get(height, 0) + 1
+            most_common = max(counts, key=counts.__getitem__) if counts else 0.0
+            self._height_stats = heights, most_common
+        return self._height_stats
 
     @property
     def height_variation(self) -> float:
-        heights = [span.bounding_box.height for span in self.spans]
-        if not heights or len(heights) == 1:
+        heights, _ = self.height_stats
+        n = len(heights)
+        if n < 2:
             return 0.0
-        mean = statistics.mean(heights)
-        std = statistics.stdev(heights)
+        # plain two-pass sample stdev, statistics.mean/stdev go through exact fractions
+        mean = math.fsum(heights) / n
         if mean == 0:
             return 0.0
-        return float(std / mean)
+        variance = math.fsum((h - mean) ** 2 for h in heights) / (n - 1)
+        return math.sqrt(variance) / mean
 
     @property
     def most_common_span_height(self) -> float:
-        heights = [span.bounding_box.height for span in self.spans]
-        if not heights:
-            return 0.0
-        counter = Counter(heights)
-        most_common = counter.most_common(1)[0][0]
+        _, most_common = self.height_stats
         return most_common
 
     @property
@@ -131,11 +190,16 @@ class LineData(BaseModel):
         )
 
 
-class BlockData(BaseModel):
+@dataclass(slots=True)
+class BlockData:
     bounding_box: BoundingBox
     index: int
     lines: List[LineData]
 
+    @property
+    def has_text(self) -> bool:
+        return any(line.has_text for line in self.lines)
+
     def from_pymupdf_block_json(block_json: json) -> "BlockData":
         return BlockData(
             bounding_box=BoundingBox.from_pymupdf_bbox_list(block_json["bbox"]),
@@ -144,7 +208,8 @@ class BlockData(BaseModel):
         )
 
 
-class PageData(BaseModel):
+@dataclass(slots=True)
+class PageData:
     height: float
     width: float
     page_number: int
@@ -161,7 +226,8 @@ class PageData(BaseModel):
         )
 
 
-class TextChunk(BaseModel):
+@dataclass(slots=True)
+class TextChunk:
     page_number: int
     text: str
     px_left: float
@@ -175,14 +241,15 @@ class TextChunk(BaseModel):
         page_number: int,
         settings: Optional[TextExtractionSettings] = None,
     ) -> "TextChunk":
-        text = span_data.clean_text(settings) if settings else span_data.text
+        text = span_data.text if settings is None else span_data.clean_text(settings)
+        x0, y0, x1, y1 = span_data.bounding_box
         return TextChunk(
             page_number=page_number,
             text=text,
-            px_left=span_data.bounding_box.px_left,
-            px_bottom=span_data.bounding_box.px_bottom,
-            width=span_data.bounding_box.width,
-            height=span_data.bounding_box.height,
+            px_left=x0,
+            px_bottom=y0,
+            width=x1 - x0,
+            height=y1 - y0,
         )
 
     @staticmethod
@@ -192,19 +259,19 @@ class TextChunk(BaseModel):
         settings: Optional[TextExtractionSettings] = None,
     ) -> "TextChunk":
         # spans = line_data.clean_spans(settings) if settings else line_data.spans
-        text = " ".join(
-            [
-                span.clean_text(settings) if settings else span.text
-                for span in line_data.spans
-            ]
-        )
+        # pick the text source once per chunk instead of once per span
+        if settings is None:
+            text = " ".join([span.text for span in line_data.spans])
+        else:
+            text = " ".join([span.clean_text(settings) for span in line_data.spans])
+        x0, y0, x1, y1 = line_data.bounding_box
         return TextChunk(
             page_number=page_number,
             text=text,
-            px_left=line_data.bounding_box.px_left,
-            px_bottom=line_data.bounding_box.px_bottom,
-            width=line_data.bounding_box.width,
-            height=line_data.bounding_box.height,
+            px_left=x0,
+            px_bottom=y0,
+            width=x1 - x0,
+            height=y1 - y0,
         )
 
     @staticmethod
@@ -213,23 +280,25 @@ class TextChunk(BaseModel):
         page_number: int,
         settings: Optional[TextExtractionSettings] = None,
     ) -> "TextChunk":
-        block_text = []
-        for line in block_data.lines:
-            line_text = []
-            # spans = line.clean_spans(settings) if settings else line.spans
-            for span in line.spans:
-                span_text = span.clean_text(settings) if settings else span.text
-                if span_text:
-                    line_text.append(span_text)
-            block_text.append(" ".join(line_text))
-        text = " ".join(block_text)
+        # join the non-empty spans of every line in one pass, without per-line strings
+        # spans = line.clean_spans(settings) if settings else line.spans
+        if settings is None:
+            span_texts = (span.text for line in block_data.lines for span in line.spans)
+        else:
+            span_texts = (
+                span.clean_text(settings)
+                for line in block_data.lines
+                for span in line.spans
+            )
+        text = " ".join(span_text for span_text in span_texts if span_text)
+        x0, y0, x1, y1 = block_data.bounding_box
         return TextChunk(
             page_number=page_number,
             text=text,
-            px_left=block_data.bounding_box.px_left,
-            px_bottom=block_data.bounding_box.px_bottom,
-            width=block_data.bounding_box.width,
-            height=block_data.bounding_box.height,
+            px_left=x0,
+            px_bottom=y0,
+            width=x1 - x0,
+            height=y1 - y0,
         )
 
 